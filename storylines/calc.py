@@ -6,6 +6,7 @@
 from __future__ import division
 
 import math
+import operator
 
 def order_of_magnitude(x):
     """Calculate the decimal order of magnitude.
@@ -72,7 +73,9 @@ def xround_mantissa(x, divisor=1):
     float
         `x` with the mantissa rounded to the closest multiple of `divisor`.
     """
-    return xround(x, divisor * power_of_ten(x))
+    divisor *= 10 ** order_of_magnitude(x)
+
+    return divisor * round(x / divisor)
 
 def multiples(lower, upper, divisor=1):
     """Iterate over all integer multiples of given number on closed interval.
@@ -84,14 +87,13 @@ def multiples(lower, upper, divisor=1):
     divisor : float
         Number the results shall be multiples of.
 
-    Yields
-    ------
-    float
-        Multiple of `divisor` between `lower` and `upper`.
+    Returns
+    -------
+    iterable of float
+        Multiples of `divisor` between `lower` and `upper`.
     """
-    for n in range(int(math.ceil(lower / divisor)),
-            int(math.floor(upper / divisor)) + 1):
-        yield divisor * n
+    return map(divisor.__mul__, range(int(math.ceil(lower / divisor)),
+        int(math.floor(upper / divisor)) + 1))
 
 def multiply(A, b):
     """Multiply vector by scalar.
@@ -170,7 +172,7 @@ def dot(A, B):
     float
         Dot product of `A` and `B`.
     """
-    return sum(a * b for a, b in zip(A, B))
+    return sum(map(operator.mul, A, B))
 
 def cross(A, B):
     """Calculate cross product of two vectors.
@@ -221,6 +223,38 @@ def distance(A, B):
     """
     return length(subtract(A, B))
 
+def _dot3(A, B):
+    """Calculate dot product of two three-dimensional vectors."""
+    return A[0] * B[0] + A[1] * B[1] + A[2] * B[2]
+
+def _length3(A):
+    """Calculate length of three-dimensional vector."""
+    return math.sqrt(A[0] * A[0] + A[1] * A[1] + A[2] * A[2])
+
+def _pairs(R1, R2, dmin, dmax):
+    """Find pairs of points with a distance between `dmin` and `dmax`.
+
+    If `R2` is `R1`, each unordered pair is considered once.
+
+    Yields
+    ------
+    int, int, float
+        Indices of points in `R1` and `R2` and their distance.
+    """
+    oneway = R2 is R1
+
+    # compare squared distances (negative bounds keep their sign):
+
+    dmin2 = dmin * abs(dmin)
+    dmax2 = dmax * abs(dmax)
+
+    for n, r1 in enumerate(R1):
+        for m in range(n + 1 if oneway else 0, len(R2)):
+            d2 = sum([(a - b) * (a - b) for a, b in zip(r1, R2[m])])
+
+            if dmin2 < d2 < dmax2:
+                yield n, m, math.sqrt(d2)
+
 def bonds(R1, R2=None, d1=0.0, d2=None, dmin=0.1, dmax=5.0):
     """Find lines that connect two sets of points.
 
@@ -246,23 +280,17 @@ def bonds(R1, R2=None, d1=0.0, d2=None, dmin=0.1, dmax=5.0):
     if d2 is None:
         d2 = d1
 
-    oneway = R2 is R1
+    for n, m, d in _pairs(R1, R2, dmin, dmax):
+        r1 = R1[n]
+        r2 = R2[m]
 
-    for n, r1 in enumerate(R1):
-        for m, r2 in enumerate(R2):
-            if oneway and m <= n:
-                continue
+        s1 = d1 / d
+        s2 = d2 / d
 
-            d = distance(r1, r2)
-
-            if dmin < d < dmax:
-                s1 = d1 / d
-                s2 = d2 / d
-
-                bonds.append([
-                    [(1 - s1) * a + s1 * b for a, b in zip(r1, r2)],
-                    [s2 * a + (1 - s2) * b for a, b in zip(r1, r2)],
-                    ])
+        bonds.append([
+            [(1 - s1) * a + s1 * b for a, b in zip(r1, r2)],
+            [s2 * a + (1 - s2) * b for a, b in zip(r1, r2)],
+            ])
 
     return bonds
 
@@ -287,16 +315,21 @@ def faces(R, d=0.0, dmin=0.1, dmax=5.0, nc=10):
     """
     faces = []
 
-    for i in range(len(R)):
-        for j in range(i + 1, len(R)):
-            if not dmin < distance(R[i], R[j]) < dmax:
-                continue
+    # check side lengths once and list neighbors with higher indices:
 
-            for k in range(j + 1, len(R)):
-                if not dmin < distance(R[j], R[k]) < dmax:
-                    continue
+    neighbors = [[] for r in R]
 
-                if not dmin < distance(R[k], R[i]) < dmax:
+    for i, j, dij in _pairs(R, R, dmin, dmax):
+        neighbors[i].append(j)
+
+    # triangles are formed by two neighbors j < k of i that are neighbors:
+
+    for i in range(len(R)):
+        adjacent = set(neighbors[i])
+
+        for j in neighbors[i]:
+            for k in neighbors[j]:
+                if k not in adjacent:
                     continue
 
                 if not d or nc < 1:
@@ -308,7 +341,10 @@ def faces(R, d=0.0, dmin=0.1, dmax=5.0, nc=10):
                         for n in range(nc + 1):
                             D = [(rj * n + rk * (nc - n)) / nc - ri
                                 for ri, rj, rk in zip(R[I], R[J], R[K])]
-                            face.append(add(R[I], multiply(D, d / length(D))))
+
+                            s = d / math.sqrt(sum([a * a for a in D]))
+
+                            face.append([ri + a * s for ri, a in zip(R[I], D)])
 
                 face.append(face[0])
                 faces.append(face)
@@ -345,13 +381,24 @@ def spring(r1, r2, N=500, k=50, radius=0.1, ends=0.15, xscale=1.0, yscale=1.0):
     x = divide(x, length(x))
     y = cross(z, x)
 
+    x1, y1, z1 = r1
+    x2, y2, z2 = r2
+
+    xx, xy, xz = x
+    yx, yy, yz = y
+
     path = []
 
     for n in range(N + 1):
-        r = divide(add(multiply(r1, N - n), multiply(r2, n)), N)
+        rx = (x1 * (N - n) + x2 * n) / N
+        ry = (y1 * (N - n) + y2 * n) / N
+        rz = (z1 * (N - n) + z2 * n) / N
+
+        d1 = math.sqrt((rx - x1) * (rx - x1) + (ry - y1) * (ry - y1)
+            + (rz - z1) * (rz - z1))
 
-        d1 = distance(r, r1)
-        d2 = distance(r, r2)
+        d2 = math.sqrt((rx - x2) * (rx - x2) + (ry - y2) * (ry - y2)
+            + (rz - z2) * (rz - z2))
 
         envelope = radius
 
@@ -361,9 +408,10 @@ def spring(r1, r2, N=500, k=50, radius=0.1, ends=0.15, xscale=1.0, yscale=1.0):
         if d2 < ends:
             envelope *= (1 - math.cos(d2 * math.pi / ends)) / 2
 
-        r = add(r, multiply(x, xscale * envelope * math.cos(k * d1)))
-        r = add(r, multiply(y, yscale * envelope * math.sin(k * d1)))
+        cx = xscale * envelope * math.cos(k * d1)
+        cy = yscale * envelope * math.sin(k * d1)
 
-        path.append(r)
+        path.append([rx + xx * cx + yx * cy, ry + xy * cx + yy * cy,
+            rz + xz * cx + yz * cy])
 
     return path
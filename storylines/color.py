@@ -42,6 +42,8 @@ class Color(object):
         self.C = C
         self.model = model
 
+        self._cache = None
+
     context = 'TeX'
 
     def __str__(self):
@@ -97,13 +99,20 @@ class Color(object):
     def RGB(self):
         """Calculate red, green, and blue components."""
 
-        if self.model == 'HSV':
-            return HSV2RGB(self.A, self.B, self.C)
-        elif self.model == 'PSV':
-            return PSV2RGB(self.A, self.B, self.C)
-        else:
+        if self.model != 'HSV' and self.model != 'PSV':
             return self.A, self.B, self.C
 
+        # reuse transformation as long as components have not been changed:
+
+        key = self.A, self.B, self.C, self.model
+
+        if self._cache is None or self._cache[0] != key:
+            transform = HSV2RGB if self.model == 'HSV' else PSV2RGB
+
+            self._cache = key, transform(self.A, self.B, self.C)
+
+        return self._cache[1]
+
     def toRGB(self):
         """Create RGB representation."""
 
@@ -157,11 +166,28 @@ def colormap(*args):
                 if color.f[n] is not None:
                     weight = color.f[n](weight)
 
-                return (1 - weight) * color.c[n] + weight * color.c[n + 1]
+                a = color.c[n]
+                b = color.c[n + 1]
+
+                # blend RGB colors directly without intermediate objects:
+
+                if a.model == b.model == 'RGB':
+                    return Color(
+                        a.A * (1 - weight) + b.A * weight,
+                        a.B * (1 - weight) + b.B * weight,
+                        a.C * (1 - weight) + b.C * weight)
+
+                return (1 - weight) * a + weight * b
 
         return default
 
-    color.x, color.c, color.f = tuple(map(list, zip(*points)))
+    color.spec, color.c, color.f = tuple(map(list, zip(*points)))
+    color.default = default
+
+    # positions given as strings are resolved relative to the data by
+    # colorize and taken literally when the colormap is called directly:
+
+    color.x = [float(x) if type(x) is str else x for x in color.spec]
 
     return color
 
@@ -182,34 +208,41 @@ def colorize(data, cmap=None, minimum=None, maximum=None):
     list of list of list
         RGB image.
     """
-    height = len(data)
-    width = len(data[0])
+    if minimum is None or maximum is None:
+        values = [x for row in data for x in row if not math.isnan(x)]
 
-    data = [x for row in data for x in row]
+        if minimum is None:
+            minimum = min(values)
 
-    if minimum is None:
-        minimum = min(x for x in data if not math.isnan(x))
-
-    if maximum is None:
-        maximum = max(x for x in data if not math.isnan(x))
+        if maximum is None:
+            maximum = max(values)
 
     if cmap is None:
         cmap = colormap((0, Color(255, 255, 255)), (1, Color(0, 0, 0)))
 
-    for n, x in enumerate(cmap.x):
-        if type(x) is str:
-            cmap.x[n] = (float(x) - minimum) / (maximum - minimum)
+    # resolve data-relative positions without modifying the given colormap:
+
+    if any(type(x) is str for x in cmap.spec):
+        cmap = colormap((None, cmap.default), *[
+            ((float(x) - minimum) / (maximum - minimum)
+                if type(x) is str else x, c, f)
+            for x, c, f in zip(cmap.spec, cmap.c, cmap.f)])
 
-    data = [(x - minimum) / (maximum - minimum) for x in data]
+    # evaluate colormap only once per distinct value:
 
-    data = [min(max(x, 0), 1) for x in data]
+    colors = {}
 
     image = []
-    for y in range(height):
+    for row in data:
         image.append([])
 
-        for x in range(width):
-            image[-1].append(cmap(data[y * width + x]).RGB())
+        for x in row:
+            x = min(max((x - minimum) / (maximum - minimum), 0), 1)
+
+            try:
+                image[-1].append(colors[x])
+            except KeyError:
+                image[-1].append(colors.setdefault(x, cmap(x).RGB()))
 
     return image
 
@@ -234,10 +267,10 @@ def HSV2RGB(H, S=1, V=255):
         S = -S
         H += 180
 
-    H %= 360
+    H = H % 360 / 60
 
-    h = int(H / 60)
-    f = H / 60 - h
+    h = int(H)
+    f = H - h
 
     p = V * (1 - S)
     q = V * (1 - S * f)
@@ -301,4 +334,8 @@ def PSV2RGB(P, S=1, V=255):
     float, float, float
         Red, green, and blue values between 0 an 255.
     """
-    return tuple(V * (0.5 - 0.5 * math.cos(P + S * n)) for n in range(3))
+    return (
+        V * (0.5 - 0.5 * math.cos(P)),
+        V * (0.5 - 0.5 * math.cos(P + S)),
+        V * (0.5 - 0.5 * math.cos(P + S * 2)),
+        )
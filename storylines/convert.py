@@ -26,6 +26,9 @@ def csv(options, context=' [%s]'):
     str
         Comma-separated key-value pairs in TikZ format (with `context`).
     """
+    if not options:
+        return ''
+
     result = ', '.join(key.replace('_', ' ')
         + ('' if value is True else '=%s' % value)
         for key, value in sorted(options.items())
@@ -5,10 +5,9 @@
 
 from __future__ import division
 
+import bisect
 import math
 
-from .group import islands
-
 def relevant(points, error=1e-3):
     """Remove irrelevant vertices of linear spline.
 
@@ -29,48 +28,60 @@ def relevant(points, error=1e-3):
             yield point
         return
 
+    N = len(points)
+
     i = 0
 
-    def included(angle):
-        return upper is None \
-            or lower is None \
-            or (angle - lower) % (2 * math.pi) \
-            <= (upper - lower) % (2 * math.pi)
+    hypot = math.hypot
+    atan2 = math.atan2
+    asin = math.asin
+    tau = 2 * math.pi
 
     while True:
         origin = points[i]
         yield origin
 
+        x0, y0 = origin[0], origin[1]
+
         former = 0.0
 
         upper = None
         lower = None
 
         while True:
-            x = points[i + 1][0] - origin[0]
-            y = points[i + 1][1] - origin[1]
+            nxt = points[i + 1]
 
-            r = math.sqrt(x ** 2 + y ** 2)
-            phi = math.atan2(y, x)
+            x = nxt[0] - x0
+            y = nxt[1] - y0
 
-            if r < former or not included(phi):
+            r = hypot(x, y)
+            phi = atan2(y, x)
+
+            # negated form also breaks for NaN, where all comparisons fail:
+
+            if r < former or upper is not None \
+                    and not ((phi - lower) % tau <= (upper - lower) % tau):
                 break
 
             i += 1
 
-            if i == len(points) - 1:
+            if i == N - 1:
                 yield points[i]
                 return
 
             former = r
 
             if r > error:
-                delta = math.asin(error / r)
+                delta = asin(error / r)
+
+                # upper and lower bounds of the cone are set together:
 
-                if included(phi + delta):
+                if upper is None \
+                        or (phi + delta - lower) % tau <= (upper - lower) % tau:
                     upper = phi + delta
 
-                if included(phi - delta):
+                if lower is None \
+                        or (phi - delta - lower) % tau <= (upper - lower) % tau:
                     lower = phi - delta
 
 def shortcut(points, length=None, length_rel=1):
@@ -91,52 +102,90 @@ def shortcut(points, length=None, length_rel=1):
     list of 2-tuple
         Linear spline with self-intersection loops removed.
     """
-    x, y = tuple(zip(*points))
+    x, y = zip(*points)
 
     N = len(x)
 
     shortcuts = []
 
-    dx = [x[i + 1] - x[i] for i in range(N - 1)]
-    dy = [y[i + 1] - y[i] for i in range(N - 1)]
+    dx = [b - a for a, b in zip(x, x[1:])]
+    dy = [b - a for a, b in zip(y, y[1:])]
+
+    sqrt = math.sqrt
+
+    total = 0
+    dist = [total]
 
-    dist = [0]
     for a, b in zip(dx, dy):
-        dist.append(dist[-1] + math.sqrt(a * a + b * b))
+        total += sqrt(a * a + b * b)
+        dist.append(total)
 
     if length is None:
         length = dist[-1]
 
     length = min(length, length_rel * dist[-1])
 
-    end = [d + length for d in dist]
+    # if many line segments are within reach along the spline, only test those
+    # in overlapping cells of a grid:
+
+    grid = None
+
+    if N >= 256 and length > 64 * dist[-1] / (N - 1):
+        size = max(max(map(abs, dx)), max(map(abs, dy)))
+
+        width = max(x) - min(x) + size
+        height = max(y) - min(y) + size
+
+        if size > 0 and width * height > 64 * size ** 2:
+            try:
+                cells, grid = _bins(x, y, size)
+            except (ValueError, OverflowError): # NaN or infinite coordinates
+                grid = None
 
     i = 0
     while i < N - 1:
-        for j in range(i + 2, N - 1):
-            if dist[j] > end[i]:
+        xi = x[i]
+        yi = y[i]
+        dxi = dx[i]
+        dyi = dy[i]
+        endi = dist[i] + length
+
+        candidates = range(i + 2, N - 1)
+
+        if grid is not None:
+            reach = range(i + 2, min(bisect.bisect_right(dist, endi), N - 1))
+
+            if sum(len(grid[cell]) for cell in cells[i]) < len(reach):
+                candidates = sorted(set(j for cell in cells[i]
+                    for j in grid[cell] if j > i + 1))
+
+        for j in candidates:
+            if dist[j] > endi:
                 break
 
-            det = dy[i] * dx[j] - dx[i] * dy[j]
+            dxj = dx[j]
+            dyj = dy[j]
+
+            det = dyi * dxj - dxi * dyj
 
             if det:
-                dxij = x[j] - x[i]
-                dyij = y[j] - y[i]
+                dxij = x[j] - xi
+                dyij = y[j] - yi
 
-                u = (dx[j] * dyij - dy[j] * dxij) / det
+                u = (dxj * dyij - dyj * dxij) / det
 
                 if 0 < u <= 1:
-                    v = (dx[i] * dyij - dy[i] * dxij) / det
+                    v = (dxi * dyij - dyi * dxij) / det
 
                     if 0 <= v < 1:
-                        if u == 1 and v == 0 and N > 4 == len(shortcut(
-                            [(x[k], y[k]) for k in (i, i + 2, j - 1, j + 1)])):
+                        if u == 1 and v == 0 and N > 4 and not _crossing(
+                                x[i], y[i], x[i + 2], y[i + 2],
+                                x[j - 1], y[j - 1], x[j + 1], y[j + 1]):
                             print('Preserve non-crossing intersection '
                                 '(%.2g, %.2g)' % (x[j], y[j]))
                             continue
 
-                        shortcuts.append((i, j,
-                            x[i] + u * dx[i], y[i] + u * dy[i]))
+                        shortcuts.append((i, j, xi + u * dxi, yi + u * dyi))
 
                         looplen = (
                             (dist[j + 1] * v + dist[j] * (1 - v)) -
@@ -158,6 +207,65 @@ def shortcut(points, length=None, length_rel=1):
 
     return list(zip(x, y))
 
+def _bins(x, y, size):
+    """Assign line segments to cells of square grid.
+
+    Each line segment is assigned to all cells its bounding box overlaps, so
+    that intersecting line segments share at least one cell.
+
+    Returns
+    -------
+    list of list of tuple
+        Cells of each line segment.
+    dict
+        Line segments (indices) in each cell.
+    """
+    cells = []
+    grid = {}
+
+    for n in range(len(x) - 1):
+        imin = int(math.floor(min(x[n], x[n + 1]) / size))
+        imax = int(math.floor(max(x[n], x[n + 1]) / size))
+        jmin = int(math.floor(min(y[n], y[n + 1]) / size))
+        jmax = int(math.floor(max(y[n], y[n + 1]) / size))
+
+        cells.append([(i, j)
+            for i in range(imin, imax + 1)
+            for j in range(jmin, jmax + 1)])
+
+        for cell in cells[-1]:
+            grid.setdefault(cell, []).append(n)
+
+    return cells, grid
+
+def _crossing(xa, ya, xb, yb, xc, yc, xd, yd):
+    """Check if line segment AB intersects line segment CD.
+
+    The criterion is the same as in :func:`shortcut`, i.e., an intersection
+    at B is counted, while one at D is not.
+    """
+    dxab = xb - xa
+    dyab = yb - ya
+    dxcd = xd - xc
+    dycd = yd - yc
+
+    det = dyab * dxcd - dxab * dycd
+
+    if not det:
+        return False
+
+    dxac = xc - xa
+    dyac = yc - ya
+
+    u = (dxcd * dyac - dycd * dxac) / det
+
+    if not 0 < u <= 1:
+        return False
+
+    v = (dxab * dyac - dyab * dxac) / det
+
+    return 0 <= v < 1
+
 def cut(points, minimum=None, maximum=None, join=False):
     """Cut off curve segments beyond y interval.
 
@@ -179,29 +287,7 @@ def cut(points, minimum=None, maximum=None, join=False):
     --------
     cut : Similar function for 2D case.
     """
-    points = [tuple(point) for point in points]
-
-    for y in minimum, maximum:
-        if y is None:
-            continue
-
-        n = 0 if join else 1
-
-        while n < len(points):
-            x1, y1 = points[n - 1]
-            x2, y2 = points[n]
-
-            if y1 < y < y2 or y1 > y > y2:
-                x = (x1 * (y2 - y) + x2 * (y - y1)) / (y2 - y1)
-                points.insert(n, (x, y))
-
-            n += 1
-
-    for island in islands(len(points), lambda n:
-            (minimum is None or points[n][1] >= minimum) and
-            (maximum is None or points[n][1] <= maximum), join):
-
-        yield [points[n] for n in island]
+    return _cut(points, minimum, maximum, join, 1)
 
 def cut2d(points, xmin, xmax, ymin, ymax, join=False):
     """Cut off curve segments beyond x and y intervals.
@@ -226,13 +312,87 @@ def cut2d(points, xmin, xmax, ymin, ymax, join=False):
     --------
     cut : Similar function for 1D case.
     """
-    for group in cut(points, ymin, ymax, join):
-        group = [(y, x) for x, y in group]
+    for group in _cut(points, ymin, ymax, join, 1):
+        for group in _cut(group, xmin, xmax, join, 0):
+            yield group
 
-        for group in cut(group, xmin, xmax, join):
-            group = [(x, y) for y, x in group]
+def _cut(points, minimum, maximum, join, axis):
+    """Cut off curve segments beyond interval along given axis.
 
-            yield group
+    See Also
+    --------
+    cut : Equivalent public function for y axis.
+    """
+    points = [tuple(point) for point in points]
+
+    other = 1 - axis
+
+    bounds = [u for u in (minimum, maximum) if u is not None]
+
+    def crossings(start, end):
+        ua = start[axis]
+        ub = end[axis]
+
+        # most line segments do not cross any bound:
+
+        for u in bounds:
+            if ua < u < ub or ua > u > ub:
+                break
+        else:
+            return []
+
+        segment = [start, end]
+
+        for u in bounds:
+            n = 1
+
+            while n < len(segment):
+                u1 = segment[n - 1][axis]
+                u2 = segment[n][axis]
+
+                if u1 < u < u2 or u1 > u > u2:
+                    v1 = segment[n - 1][other]
+                    v2 = segment[n][other]
+
+                    v = (v1 * (u2 - u) + v2 * (u - u1)) / (u2 - u1)
+                    segment.insert(n, (u, v) if axis == 0 else (v, u))
+
+                    n += 1
+
+                n += 1
+
+        return segment[1:-1]
+
+    def vertices():
+        if join and points:
+            for point in crossings(points[-1], points[0]):
+                yield point
+
+        previous = None
+
+        for point in points:
+            if previous is not None:
+                for crossing in crossings(previous, point):
+                    yield crossing
+
+            yield point
+
+            previous = point
+
+    island = []
+
+    for point in vertices():
+        if ((minimum is None or point[axis] >= minimum) and
+            (maximum is None or point[axis] <= maximum)):
+
+            island.append(point)
+
+        elif island and not join:
+            yield island
+            island = []
+
+    if island:
+        yield island
 
 def jump(points, distance=1.0):
     """Interpret long line segments as discontinuities and omit them.
@@ -249,21 +409,32 @@ def jump(points, distance=1.0):
     list of 2-tuple
         Separated curve segment.
     """
-    points = [tuple(point) for point in points]
+    points = iter(points)
+
+    try:
+        point = tuple(next(points))
+    except StopIteration:
+        return
+
+    x0, y0 = point
+
+    squared = distance * distance
 
-    group = []
+    group = [point]
 
-    for n in range(len(points)):
-        if group:
-            x1, y1 = points[n - 1]
-            x2, y2 = points[n]
+    for point in points:
+        point = tuple(point)
+        x, y = point
 
-            if (x2 - x1) ** 2 + (y2 - y1) ** 2 > distance ** 2:
-                yield group
-                group = [points[n]]
-                continue
+        dx = x - x0
+        dy = y - y0
+
+        if dx * dx + dy * dy > squared:
+            yield group
+            group = [point]
+        else:
+            group.append(point)
 
-        group.append(points[n])
+        x0, y0 = x, y
 
-    if group:
-        yield group
+    yield group
@@ -36,35 +36,76 @@ def fatband(points, width, weights, shifts, nib=None):
     """
     N = len(points)
 
-    x, y = tuple(zip(*points))
+    x, y = zip(*points)
+
+    # without weights and shifts, both sides of the outline follow the line:
+
+    if not any(weights) and not any(shifts):
+        A = list(zip(x, y))
+
+        return A + A[::-1]
 
     if nib is not None:
-        alpha = [nib] * (N - 1)
+        cos = [math.cos(nib) * width] * N
+        sin = [math.sin(nib) * width] * N
     else:
-        alpha = [(math.pi / 2 + math.atan2(y[n + 1] - y[n], x[n + 1] - x[n]))
-            % (2 * math.pi) for n in range(N - 1)]
+        # unit normals of line segments follow from their direction vectors:
+
+        deltas = [(xb - xa, yb - ya)
+            for xa, ya, xb, yb in zip(x, y, x[1:], y[1:])]
+
+        normals = []
+
+        for dx, dy in deltas:
+            length = math.hypot(dx, dy)
+
+            normals.append((-dy / length, dx / length)
+                if length else (0.0, 1.0))
+
+        # normals at inner vertices bisect those of adjacent segments:
+
+        directions = normals[:1]
+
+        for n in range(N - 2):
+            nxa, nya = normals[n]
+            nxb, nyb = normals[n + 1]
 
-    phi = alpha[:1]
+            if nxa * nxb + nya * nyb > -0.5:
+                nx = nxa + nxb
+                ny = nya + nyb
 
-    for n in range(N - 2):
-        phi.append(sum(alpha[n:n + 2]) / 2)
+                length = math.hypot(nx, ny)
 
-        if max(alpha[n:n + 2]) - min(alpha[n:n + 2]) > math.pi:
-            phi[-1] += math.pi
+                directions.append((nx / length, ny / length))
+            else: # sum of normals ill-conditioned for turns beyond 120 deg
+                a, b = [(math.pi / 2 + math.atan2(dy, dx)) % (2 * math.pi)
+                    for dx, dy in deltas[n:n + 2]]
 
-    phi.append(alpha[-1])
+                angle = (a + b) / 2
 
-    X = []
-    Y = []
+                if abs(a - b) > math.pi:
+                    angle += math.pi
 
-    for sgn in 1, -1:
-        for n in range(N) if sgn == 1 else reversed(range(N)):
-            X.append(x[n] + math.cos(phi[n]) * width
-                * (shifts[n] + sgn * weights[n] / 2))
-            Y.append(y[n] + math.sin(phi[n]) * width
-                * (shifts[n] + sgn * weights[n] / 2))
+                directions.append((math.cos(angle), math.sin(angle)))
 
-    return list(zip(X, Y))
+        directions.append(normals[-1])
+
+        cos = [nx * width for nx, ny in directions]
+        sin = [ny * width for nx, ny in directions]
+
+    A = []
+    B = []
+
+    for xn, yn, cn, sn, shift, weight in zip(x, y, cos, sin, shifts, weights):
+        a = shift + weight / 2
+        b = shift - weight / 2
+
+        A.append((xn + cn * a, yn + sn * a))
+        B.append((xn + cn * b, yn + sn * b))
+
+    B.reverse()
+
+    return A + B
 
 def miter_butt(points, width, weights, shifts, nib=None):
     """Represent weighted data points via varying linewidth.
@@ -95,70 +136,65 @@ def miter_butt(points, width, weights, shifts, nib=None):
     """
     N = len(points)
 
-    x, y = tuple(zip(*points))
+    x, y = zip(*points)
+
+    # offsets of vertices (miter apexes) from line for half the linewidth:
+
+    h = 0.5 * width
 
-    upper = []
-    lower = []
+    if nib is not None:
+        offsets = [(h * math.cos(nib), h * math.sin(nib))] * N
+    else:
+        deltas = [(xb - xa, yb - ya)
+            for xa, ya, xb, yb in zip(x, y, x[1:], y[1:])]
 
-    for n in range(N - 1):
-        if nib is not None:
-            alpha = nib
-        else:
-            alpha = math.atan2(y[n + 1] - y[n], x[n + 1] - x[n]) + math.pi / 2
+        normals = []
 
-        dx = 0.5 * width * math.cos(alpha)
-        dy = 0.5 * width * math.sin(alpha)
+        for dx, dy in deltas:
+            length = math.hypot(dx, dy)
 
-        lower.append((x[n] - dx, y[n] - dy, x[n + 1] - dx, y[n + 1] - dy))
-        upper.append((x[n] + dx, y[n] + dy, x[n + 1] + dx, y[n + 1] + dy))
+            normals.append((-dy / length, dx / length)
+                if length else (0.0, 1.0))
 
-    X = []
-    Y = []
+        offsets = [(h * normals[0][0], h * normals[0][1])]
 
-    for segs in upper, lower:
-        X.append([segs[0][0]])
-        Y.append([segs[0][1]])
+        for n in range(N - 2):
+            dx1, dy1 = deltas[n]
+            dx2, dy2 = deltas[n + 1]
 
-        for n in range(1, N - 1):
-            x1a, y1a, x1b, y1b = segs[n - 1]
-            x2a, y2a, x2b, y2b = segs[n]
+            nx1, ny1 = normals[n]
+            nx2, ny2 = normals[n + 1]
 
-            dx1 = x1b - x1a
-            dy1 = y1b - y1a
+            # apex of offset lines lies on bisector of normals:
 
-            dx2 = x2b - x2a
-            dy2 = y2b - y2a
+            if dy1 * dx2 - dx1 * dy2:
+                s = h / (1 + nx1 * nx2 + ny1 * ny2)
 
-            det = dy1 * dx2 - dx1 * dy2
+                offsets.append(((nx1 + nx2) * s, (ny1 + ny2) * s))
+            else: # parallel or degenerate segments
+                offsets.append((h * nx2, h * ny2))
 
-            if det:
-                X[-1].append((x1a * dy1 * dx2 - y1a * dx1 * dx2
-                    - x2a * dx1 * dy2 + y2a * dx1 * dx2) / det)
+        offsets.append((h * normals[-1][0], h * normals[-1][1]))
 
-                Y[-1].append((x1a * dy1 * dy2 - y1a * dx1 * dy2
-                    - x2a * dy1 * dy2 + y2a * dy1 * dx2) / det)
-            else:
-                X[-1].append(x2a)
-                Y[-1].append(y2a)
+    # interpolate between upper and lower miter joints:
 
-        X[-1].append(segs[-1][2])
-        Y[-1].append(segs[-1][3])
+    A = []
+    B = []
 
-    XA = []
-    XB = []
-    YA = []
-    YB = []
+    for xn, yn, (ox, oy), shift, weight in zip(x, y, offsets, shifts, weights):
+        x1 = xn + ox
+        x2 = xn - ox
+        y1 = yn + oy
+        y2 = yn - oy
 
-    for n in range(N):
-        a1 = 0.5 + shifts[n] - 0.5 * weights[n]
-        a2 = 0.5 - shifts[n] + 0.5 * weights[n]
-        b1 = 0.5 + shifts[n] + 0.5 * weights[n]
-        b2 = 0.5 - shifts[n] - 0.5 * weights[n]
+        a1 = 0.5 + shift - 0.5 * weight
+        a2 = 0.5 - shift + 0.5 * weight
+        b1 = 0.5 + shift + 0.5 * weight
+        b2 = 0.5 - shift - 0.5 * weight
 
-        XA.append(a1 * X[0][n] + a2 * X[1][n])
-        XB.append(b1 * X[0][n] + b2 * X[1][n])
+        A.append((a1 * x1 + a2 * x2, a1 * y1 + a2 * y2))
+        B.append((b1 * x1 + b2 * x2, b1 * y1 + b2 * y2))
 
-        YA.append(a1 * Y[0][n] + a2 * Y[1][n])
-        YB.append(b1 * Y[0][n] + b2 * Y[1][n])
+    B.reverse()
 
-    return list(zip(XA + XB[::-1], YA + YB[::-1]))
+    return A + B
@@ -10,6 +10,8 @@ import subprocess
 
 from .png import save, load
 
+_replace = getattr(os, 'replace', os.rename) # Python 2 lacks os.replace
+
 def goto(filename):
     """Go to output directory for plot typesetting.
 
@@ -29,18 +31,23 @@ def goto(filename):
     """
     head, tail = os.path.split(filename)
 
-    for extension in 'tex', 'pdf', 'png':
-        if tail.endswith('.%s' % extension):
-            stem = tail[:-len(extension) - 1]
-            typ = extension
-            break
-    else:
+    stem, extension = os.path.splitext(tail)
+
+    typ = extension[1:].lower()
+
+    if typ not in ('tex', 'pdf', 'png'):
         stem = tail
         typ = None
 
     if head:
         cwd = os.getcwd()
-        subprocess.call(['mkdir', '-p', head])
+
+        try:
+            os.makedirs(head)
+        except OSError: # Python 2 lacks exist_ok
+            if not os.path.isdir(head):
+                raise
+
         os.chdir(head)
 
     def home():
@@ -96,7 +103,7 @@ def rasterize(stem, dpi=300.0, width=0, height=0, rewrite=False):
 
         subprocess.call(['pdftoppm'] + args + ['%s.pdf' % stem, stem])
 
-        os.rename('%s-1.png' % stem, '%s.png' % stem)
+        _replace('%s-1.png' % stem, '%s.png' % stem)
 
         if rewrite:
             save('%s.png' % stem, load('%s.png' % stem))
@@ -136,23 +143,30 @@ def combine(filename, pdfs, columns=100, align=0.5, halign='left', pdf=False,
     png = png or typ == 'png'
     pdf = pdf or typ == 'pdf' or png
 
-    with open('%s.tex' % stem, 'w') as tex:
-        tex.write('\\documentclass[varwidth=1189mm]{standalone}\n'
-            '\\usepackage{graphicx}\n'
-            '\\begin{document}\n'
-            '\\noindent%\n')
+    tex = []
+    write = tex.append
+
+    write('\\documentclass[varwidth=1189mm]{standalone}\n'
+        '\\usepackage{graphicx}\n'
+        '\\begin{document}\n'
+        '\\noindent%\n')
+
+    if halign == 'center':
+        write('\\centering%\n')
+    elif halign == 'right':
+        write('\\raggedleft%\n')
+
+    for n in range(len(pdfs)):
+        nobreak = (n + 1) % columns or n + 1 == len(pdfs)
+        write('\\raisebox{-%g\\height}{\\includegraphics{{%s}.pdf}}%s\n'
+            % (align, pdfs[n], '%' if nobreak else '\\\\[-\\lineskip]'))
 
-        if halign == 'center':
-            tex.write('\\centering%\n')
-        elif halign == 'right':
-            tex.write('\\raggedleft%\n')
+    write('\\end{document}\n')
 
-        for n in range(len(pdfs)):
-            nobreak = (n + 1) % columns or n + 1 == len(pdfs)
-            tex.write('\\raisebox{-%g\\height}{\\includegraphics{{%s}.pdf}}%s\n'
-                % (align, pdfs[n], '%' if nobreak else '\\\\[-\\lineskip]'))
+    # write LaTeX file at once:
 
-        tex.write('\\end{document}\n')
+    with open('%s.tex' % stem, 'w') as file:
+        file.write(''.join(tex))
 
     if pdf:
         typeset(stem)
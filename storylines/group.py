@@ -5,6 +5,8 @@
 
 from __future__ import division
 
+import itertools
+
 def islands(N, criterion, join=False):
     """Select subranges of integer range.
 
@@ -22,13 +24,21 @@ def islands(N, criterion, join=False):
     list of int
         Elements of subrange.
     """
+    if join:
+        island = list(filter(criterion, range(N)))
+
+        if island:
+            yield island
+
+        return
+
     island = []
 
     for n in range(N):
         if criterion(n):
             island.append(n)
 
-        elif island and not join:
+        elif island:
             yield island
             island = []
 
@@ -50,14 +60,12 @@ def groups(iterable, size=4):
     list
         Group of objects.
     """
-    group = []
+    iterator = iter(iterable)
 
-    for item in iterable:
-        group.append(item)
+    while True:
+        group = list(itertools.islice(iterator, size))
 
-        if len(group) == size:
-            yield group
-            group = []
+        if not group:
+            return
 
-    if group:
         yield group
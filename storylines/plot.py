@@ -17,6 +17,59 @@ from .files import goto, typeset, rasterize
 from .group import islands, groups
 from .png import save
 
+_minus = '\\smash{\\llap\\textminus}'
+
+_abbreviations = ('c', 'lr'), ('C', 'LR'), ('m', 'bt'), ('M', 'BT')
+
+_length = re.compile('<([\\d.]+)>')
+_coordinate = re.compile('<(d?)([xy])=(.*?)>')
+
+def _default_format(x):
+    x = '%g' % x
+    return x.replace('-', _minus) if '-' in x else x
+
+def _parenthesized(label):
+    return '(%s)' % label
+
+def _bold(label):
+    return '\\textbf{%s}' % label
+
+def _unlabeled(x):
+    return False
+
+_styles = dict(
+    APS=dict(
+        font='Times',
+        fontsize=9,
+        labelformat=_parenthesized,
+        single=8.6,
+        double=17.8,
+        ),
+    NanoLett=dict(
+        font='Helvetica',
+        fontsize=9,
+        labelformat=_parenthesized,
+        single=3.33 * inch,
+        double=7.0 * inch,
+        ),
+    NatCommun=dict(
+        font='Helvetica',
+        fontsize=8,
+        labelsize=9,
+        labelformat=_bold,
+        single=8.8,
+        double=18.0,
+        ),
+    Nature=dict(
+        font='Helvetica',
+        fontsize=7,
+        labelsize=8,
+        labelformat=_bold,
+        single=8.9,
+        double=18.3,
+        ),
+    )
+
 class Plot():
     """Plot object.
 
@@ -100,8 +153,9 @@ class Plot():
         Padding between data and axes in data units.
     xclose, yclose, zclose : bool, default False
         Place axis labels in space reserved for tick labels.
-    xformat, yformat, zformat : function
-        Tick formatter. Takes tick position as argument.
+    xformat, yformat, zformat : function or str
+        Tick formatter. Takes tick position as argument. Alternatively, a
+        format string such as ``'${:.2f}$'`` can be given.
     lower : str, default 'blue'
         Lower color of colorbar. Can also be of type ``Color`` as long as
         `upper` has the same type.
@@ -259,8 +313,7 @@ class Plot():
             setattr(self, x + 'max', None)
             setattr(self, x + 'padding', 0.0)
             setattr(self, x + 'close', False)
-            setattr(self, x + 'format',
-                lambda x: ('%g' % x).replace('-', '\\smash{\\llap\\textminus}'))
+            setattr(self, x + 'format', _default_format)
 
         for x in 'xy':
             setattr(self, x + 'minorticks', None)
@@ -331,36 +384,9 @@ class Plot():
         if rounded:
             self.options.update(line_cap='round', line_join='round')
 
-        if style is not None:
-            if style == 'APS':
-                self.font = 'Times'
-                self.fontsize = 9
-                self.labelformat = lambda x: '(%s)' % x
-                self.single = 8.6
-                self.double = 17.8
-
-            elif style == 'NanoLett':
-                self.font = 'Helvetica'
-                self.fontsize = 9
-                self.labelformat = lambda x: '(%s)' % x
-                self.single = 3.33 * inch
-                self.double = 7.0 * inch
-
-            elif style == 'NatCommun':
-                self.font = 'Helvetica'
-                self.fontsize = 8
-                self.labelsize = 9
-                self.labelformat = lambda x: '\\textbf{%s}' % x
-                self.single = 8.8
-                self.double = 18.0
-
-            elif style == 'Nature':
-                self.font = 'Helvetica'
-                self.fontsize = 7
-                self.labelsize = 8
-                self.labelformat = lambda x: '\\textbf{%s}' % x
-                self.single = 8.9
-                self.double = 18.3
+        if style in _styles:
+            for name, value in _styles[style].items():
+                setattr(self, name, value)
 
         if self.width is None:
             self.width = self.single
@@ -469,10 +495,10 @@ class Plot():
         **options
             Local TikZ options.
         """
-        if not hasattr(x, '__len__'):
+        if not isinstance(x, (list, tuple)) and not hasattr(x, '__len__'):
             x = [x]
 
-        if not hasattr(y, '__len__'):
+        if not isinstance(y, (list, tuple)) and not hasattr(y, '__len__'):
             y = [y]
 
         new_line = dict(
@@ -535,8 +561,14 @@ class Plot():
         except TypeError:
             shifts = [shifts] * len(x)
 
-        for island in islands(len(weights),
-            lambda n: any(weights[max(n - 1, 0):n + 2])):
+        # keep vertices with nonzero weight and their neighbors:
+
+        nonzero = [bool(weight) for weight in weights]
+
+        visible = [a or b or c for a, b, c in zip([False] + nonzero[:-1],
+            nonzero, nonzero[1:] + [False])]
+
+        for island in islands(len(visible), visible.__getitem__):
 
             if len(island) > 1:
                 n = slice(island[0], island[-1] + 1)
@@ -582,14 +614,15 @@ class Plot():
         shifts = []
 
         for parts in weights:
-            shifts.append([0])
-            shift = shifts[-1]
+            starts = []
+            total = 0
 
             for part in parts:
-                shift.append(shift[-1] + part)
+                starts.append(total)
+                total += part
 
-            for m, part in enumerate(parts):
-                shift[m] -= (shift[-1] - part) / 2
+            shifts.append([start - (total - part) / 2
+                for start, part in zip(starts, parts)])
 
         sgn = +1
         for weights, shifts, color in zip(zip(*weights), zip(*shifts), colors):
@@ -738,6 +771,37 @@ class Plot():
         engine : str, default 'pdflatex'
             TeX typesetting engine.
         """
+        # collect data extrema and required features in a single pass:
+
+        free = [x for x in 'xy'
+            if getattr(self, x + 'min') is None
+            or getattr(self, x + 'max') is None]
+
+        extrema = dict(x=[], y=[], z=[])
+
+        plotmarks = False
+        axes = False
+
+        for line in self.lines:
+            for x in free:
+                X = line[x]
+
+                if not len(X):
+                    continue
+
+                extrema[x].append(min(X))
+                extrema[x].append(max(X))
+
+            if line['z'] is not None:
+                extrema['z'].append(line['z'])
+
+            if ('mark' in line['options'] and line['options']['mark']
+                    not in ['*', '+', 'x', 'ball']):
+                plotmarks = True
+
+            if line['axes']:
+                axes = True
+
         # determine data limits:
 
         lower = {}
@@ -747,12 +811,7 @@ class Plot():
             xmin = getattr(self, x + 'min')
             xmax = getattr(self, x + 'max')
 
-            if xmin is None or xmax is None:
-                if x == 'z':
-                    X = [line[x] for line in self.lines if line[x] is not None]
-
-                else:
-                    X = [value for line in self.lines for value in line[x]]
+            X = extrema[x]
 
             if x == 'z' and self.colorbar is None:
                 self.colorbar = xmin is not None and xmax is not None or bool(X)
@@ -760,8 +819,10 @@ class Plot():
             lower[x] = xmin if xmin is not None else min(X) if X else 0.0
             upper[x] = xmax if xmax is not None else max(X) if X else 0.0
 
-            lower[x] -= getattr(self, x + 'padding')
-            upper[x] += getattr(self, x + 'padding')
+            padding = getattr(self, x + 'padding')
+
+            lower[x] -= padding
+            upper[x] += padding
 
             # embed zero- and one-dimensional data:
 
@@ -912,21 +973,34 @@ class Plot():
 
             xformat = getattr(self, x + 'format')
 
-            if getattr(self, x + 'ticks') is not None:
-                ticks[x] = [(scale[x] * (n - lower[x]), label) for n, label in
+            if isinstance(xformat, str):
+                xformat = xformat.format
+
+            # do not format labels that are not shown:
+
+            labels = getattr(self, x + 'labels')
+
+            if not labels:
+                xformat = _unlabeled
+
+            xscale = scale[x]
+            xlower = lower[x]
+
+            xticks = getattr(self, x + 'ticks')
+
+            if xticks is not None:
+                ticks[x] = [(xscale * (n - xlower), label) for n, label in
                     [tick if hasattr(tick, '__len__') else (tick, xformat(tick))
-                        for tick in getattr(self, x + 'ticks')]]
+                        for tick in xticks]]
 
-                ticks[x] = [(position, label) for position, label in ticks[x]
+                ticks[x] = [(position, label if labels else False)
+                    for position, label in ticks[x]
                     if -self.eps <= position <= extent[x] + self.eps]
             else:
-                ticks[x] = [(scale[x] * (n - lower[x]), xformat(n))
-                    for n in multiples(lower[x], upper[x],
+                ticks[x] = [(xscale * (n - xlower), xformat(n))
+                    for n in multiples(xlower, upper[x],
                         getattr(self, x + 'step') or xround_mantissa(
-                        getattr(self, x + 'spacing') / scale[x]))]
-
-            if not getattr(self, x + 'labels'):
-                ticks[x] = [(position, False) for position, label in ticks[x]]
+                        getattr(self, x + 'spacing') / xscale))]
 
         # determine minor-tick positions:
 
@@ -937,14 +1011,14 @@ class Plot():
                 positions = getattr(self, x + 'minorticks')
 
                 if positions is None:
-                    if (getattr(self, x + 'minorstep') is None and
-                        getattr(self, x + 'minorspacing') is None):
+                    step = getattr(self, x + 'minorstep')
+                    spacing = getattr(self, x + 'minorspacing')
 
+                    if step is None and spacing is None:
                         positions = []
                     else:
                         positions = multiples(lower[x], upper[x],
-                            getattr(self, x + 'minorstep') or xround_mantissa(
-                            getattr(self, x + 'minorspacing') / scale[x]))
+                            step or xround_mantissa(spacing / scale[x]))
 
                 minorticks[x] = [scale[x] * (n - lower[x]) for n in positions]
 
@@ -957,8 +1031,8 @@ class Plot():
 
         # handle horizontal and vertical lines:
 
-        for x, y in 'xy', 'yx':
-            for line in self.lines:
+        for line in self.lines:
+            for x, y in 'xy', 'yx':
                 if not len(line[x]) and len(line[y]) == 1:
                     line[x] = [lower[x], upper[x]]
                     line[y] = [line[y][0]] * 2
@@ -983,697 +1057,740 @@ class Plot():
         if pdf:
             standalone = True
 
-        with open('%s.tex' % stem, 'w') as file:
-            # print premable and open document:
-
-            if standalone:
-                file.write('\\documentclass[class=%s, %dpt]{standalone}\n'
-                    % ('article' if 10 <= self.fontsize <= 12 else 'scrartcl',
-                        self.fontsize))
-                file.write('\\usepackage{tikz}\n')
-
-                if self.inputenc and 'inputenc' not in self.preamble:
-                    file.write('\\usepackage[%s]{inputenc}\n' % self.inputenc)
-
-                if self.font is not None:
-                    texfonts = {
-                        'Gill Sans':
-                            '\\usepackage[math]{iwona}\n'
-                            '\\usepackage[sfdefault]{cabin}\n'
-                            '\\usepackage[italic, noplusnominus]{mathastext}\n',
-                        'Helvetica':
-                            '\\usepackage{sansmathfonts}\n'
-                            '\\usepackage[scaled]{helvet}\n'
-                            '\\let\\familydefault\\sfdefault\n'
-                            '\\usepackage[italic]{mathastext}\n',
-                        'Iwona':
-                            '\\usepackage[math]{iwona}\n',
-                        'Latin Modern':
-                            '\\usepackage{lmodern}\n',
-                        'Times':
-                            '\\usepackage{newtxtext, newtxmath}\n',
-                        'Utopia':
-                            '\\usepackage{fourier}',
-                        }
-
-                    if self.font in texfonts:
-                        file.write(texfonts[self.font])
-
-                        if self.fontenc is None:
-                            self.fontenc = 'T1'
-                    else:
-                        file.write('\\usepackage{mathspec}\n')
-                        file.write('\\setallmainfonts{%s}\n' % self.font)
+        tex = []
+        write = tex.append
+
+        # print premable and open document:
+
+        if standalone:
+            write('\\documentclass[class=%s, %dpt]{standalone}\n'
+                % ('article' if 10 <= self.fontsize <= 12 else 'scrartcl',
+                    self.fontsize))
+            write('\\usepackage{tikz}\n')
+
+            if self.inputenc and 'inputenc' not in self.preamble:
+                write('\\usepackage[%s]{inputenc}\n' % self.inputenc)
+
+            if self.font is not None:
+                texfonts = {
+                    'Gill Sans':
+                        '\\usepackage[math]{iwona}\n'
+                        '\\usepackage[sfdefault]{cabin}\n'
+                        '\\usepackage[italic, noplusnominus]{mathastext}\n',
+                    'Helvetica':
+                        '\\usepackage{sansmathfonts}\n'
+                        '\\usepackage[scaled]{helvet}\n'
+                        '\\let\\familydefault\\sfdefault\n'
+                        '\\usepackage[italic]{mathastext}\n',
+                    'Iwona':
+                        '\\usepackage[math]{iwona}\n',
+                    'Latin Modern':
+                        '\\usepackage{lmodern}\n',
+                    'Times':
+                        '\\usepackage{newtxtext, newtxmath}\n',
+                    'Utopia':
+                        '\\usepackage{fourier}',
+                    }
+
+                if self.font in texfonts:
+                    write(texfonts[self.font])
+
+                    if self.fontenc is None:
+                        self.fontenc = 'T1'
+                else:
+                    write('\\usepackage{mathspec}\n')
+                    write('\\setallmainfonts{%s}\n' % self.font)
 
-                        engine = 'xelatex'
+                    engine = 'xelatex'
 
-                if self.fontenc and 'fontenc' not in self.preamble:
-                    file.write('\\usepackage[%s]{fontenc}\n' % self.fontenc)
+            if self.fontenc and 'fontenc' not in self.preamble:
+                write('\\usepackage[%s]{fontenc}\n' % self.fontenc)
 
-                if self.preamble:
-                    file.write('%s\n' % self.preamble.strip())
+            if self.preamble:
+                write('%s\n' % self.preamble.strip())
 
-                for line in self.lines:
-                    if ('mark' in line['options'] and line['options']['mark']
-                            not in ['*', '+', 'x', 'ball']):
-                        file.write('\\usetikzlibrary{plotmarks}\n')
-                        break
+            if plotmarks:
+                write('\\usetikzlibrary{plotmarks}\n')
 
-                file.write('\\begin{document}\n\\noindent\n')
+            write('\\begin{document}\n\\noindent\n')
 
-            # set filename for externalization:
+        # set filename for externalization:
 
-            elif external:
-                file.write('\\tikzsetnextfilename{%s}\n%%\n' % stem)
+        elif external:
+            write('\\tikzsetnextfilename{%s}\n%%\n' % stem)
 
-            # open TikZ environment:
+        # open TikZ environment:
 
-            file.write('\\begin{tikzpicture}%s' % csv(self.options, '[%s]'))
+        write('\\begin{tikzpicture}%s' % csv(self.options, '[%s]'))
 
-            # set bounding box:
+        # set bounding box:
 
-            bbox = ('\n  (%.3f, %.3f) rectangle +(%.3f, %.3f);'
-                % (-self.left, -self.bottom, self.width, self.height))
+        bbox = ('\n  (%.3f, %.3f) rectangle +(%.3f, %.3f);'
+            % (-self.left, -self.bottom, self.width, self.height))
 
-            file.write('\n\\useasboundingbox')
-            file.write(bbox)
+        write('\n\\useasboundingbox')
+        write(bbox)
 
-            if self.canvas is not None:
-                file.write('\n\\draw%s'
-                    % csv(dict(color=self.canvas, line_width='1mm', fill=True)))
-                file.write(bbox)
+        if self.canvas is not None:
+            write('\n\\draw%s'
+                % csv(dict(color=self.canvas, line_width='1mm', fill=True)))
+            write(bbox)
 
-            if self.outline:
-                file.write('\n\\draw%s'
-                    % csv(dict(color='gray', very_thin=True, dashed=True)))
-                file.write(bbox)
+        if self.outline:
+            write('\n\\draw%s'
+                % csv(dict(color='gray', very_thin=True, dashed=True)))
+            write(bbox)
 
-            # add background image:
+        # add background image:
 
-            if self.background is not None:
-                file.write('\n\\node '
-                    '[anchor=south west, inner sep=0, outer sep=0] '
-                    '{\\includegraphics[width=%.3fcm, height=%.3fcm]{%s}};'
-                    % (extent['x'], extent['y'], self.background))
+        if self.background is not None:
+            write('\n\\node '
+                '[anchor=south west, inner sep=0, outer sep=0] '
+                '{\\includegraphics[width=%.3fcm, height=%.3fcm]{%s}};'
+                % (extent['x'], extent['y'], self.background))
 
-            # draw coordinate system:
+        # draw coordinate system:
 
-            origin = {}
+        origin = {}
 
-            for x in 'xy':
-                xorigin = getattr(self, x + 'origin')
+        for x in 'xy':
+            xorigin = getattr(self, x + 'origin')
 
-                if xorigin is None:
-                    origin[x] = 0
-                else:
-                    origin[x] = scale[x] * (xorigin - lower[x])
+            if xorigin is None:
+                origin[x] = 0
+            else:
+                origin[x] = scale[x] * (xorigin - lower[x])
 
-            for x, y in 'xy', 'yx':
-                if not origin[y]:
-                    continue
+        for x, y in 'xy', 'yx':
+            if not origin[y]:
+                continue
 
-                ticks[x] = [(position, label) for position, label in ticks[x]
+            ticks[x] = [(position, label) for position, label in ticks[x]
+                if not abs(position - origin[x]) < self.resolution]
+
+            if getattr(self, x + 'minorticks'):
+                minorticks[x] = [position for position in minorticks[x]
                     if not abs(position - origin[x]) < self.resolution]
 
-                if getattr(self, x + 'minorticks'):
-                    minorticks[x] = [position for position in minorticks[x]
-                        if not abs(position - origin[x]) < self.resolution]
+        def draw_grid():
+            if draw_grid.done:
+                return
 
-            def draw_grid():
-                if draw_grid.done:
-                    return
+            lines = {}
 
-                lines = {}
+            for x in 'xy':
+                lines[x] = set()
 
-                for x in 'xy':
-                    lines[x] = set()
+                if getattr(self, x + 'axis'):
+                    lines[x].add(origin[x])
 
-                    if getattr(self, x + 'axis'):
-                        lines[x].add(origin[x])
+                if self.frame:
+                    lines[x].add(0.0)
+                    lines[x].add(extent[x])
 
-                    if self.frame:
-                        lines[x].add(0.0)
-                        lines[x].add(extent[x])
+            if self.minorgrid:
+                write('\n\\draw [lightgray!50, line cap=rect]')
 
-                if self.minorgrid:
-                    file.write('\n\\draw [lightgray!50, line cap=rect]')
+                for x in minorticks['x']:
+                    if not any(abs(x - line) < self.resolution
+                            for line in lines['x']):
 
-                    for x in minorticks['x']:
-                        if not any(abs(x - line) < self.resolution
-                                for line in lines['x']):
+                        write('\n  (%.3f, 0) -- +(0, %.3f)'
+                            % (x, extent['y']))
 
-                            file.write('\n  (%.3f, 0) -- +(0, %.3f)'
-                                % (x, extent['y']))
+                for y in minorticks['y']:
+                    if not any(abs(y - line) < self.resolution
+                            for line in lines['y']):
 
-                    for y in minorticks['y']:
-                        if not any(abs(y - line) < self.resolution
-                                for line in lines['y']):
+                        write('\n  (0, %.3f) -- +(%.3f, 0)'
+                            % (y, extent['x']))
 
-                            file.write('\n  (0, %.3f) -- +(%.3f, 0)'
-                                % (y, extent['x']))
+                write(';')
 
-                    file.write(';')
+            write('\n\\draw [lightgray, line cap=rect]')
 
-                file.write('\n\\draw [lightgray, line cap=rect]')
+            for x, label in ticks['x']:
+                if not any(abs(x - line) < self.resolution
+                        for line in lines['x']):
 
-                for x, label in ticks['x']:
-                    if not any(abs(x - line) < self.resolution
-                            for line in lines['x']):
+                    write('\n  (%.3f, 0) -- +(0, %.3f)'
+                        % (x, extent['y']))
 
-                        file.write('\n  (%.3f, 0) -- +(0, %.3f)'
-                            % (x, extent['y']))
+            for y, label in ticks['y']:
+                if not any(abs(y - line) < self.resolution
+                        for line in lines['y']):
 
-                for y, label in ticks['y']:
-                    if not any(abs(y - line) < self.resolution
-                            for line in lines['y']):
+                    write('\n  (0, %.3f) -- +(%.3f, 0)'
+                        % (y, extent['x']))
 
-                        file.write('\n  (0, %.3f) -- +(%.3f, 0)'
-                            % (y, extent['x']))
+            write(';')
 
-                file.write(';')
+            draw_grid.done = True
 
-                draw_grid.done = True
+        draw_grid.done = False
 
-            draw_grid.done = False
+        def draw_frame():
+            if draw_frame.done:
+                return
 
-            def draw_frame():
-                if draw_frame.done:
-                    return
+            ex = extent['x']
+            ey = extent['y']
 
-                file.write('\n\\draw [gray, line cap=rect]\n  ')
+            write('\n\\draw [gray, line cap=rect]\n  '
+                '%s(%.3f, 0) -- (%.3f, %.3f) -- (0, %.3f)%s;' % (
+                    '(0, 0) -- ' if not self.xaxis or origin['y'] else '',
+                    ex, ex, ey, ey,
+                    ' -- (0, 0)' if not self.yaxis or origin['x'] else ''))
 
-                if not self.xaxis or origin['y']:
-                    file.write('(0, 0) -- ')
+            draw_frame.done = True
 
-                file.write('(%.3f, 0) -- (%.3f, %.3f) -- (0, %.3f)'
-                    % tuple(extent[x] for x in 'xxyy'))
+        draw_frame.done = False
 
-                if not self.yaxis or origin['x']:
-                    file.write(' -- (0, 0)')
+        def draw_axes():
+            if draw_axes.done:
+                return
 
-                file.write(';')
+            # paint colorbar:
 
-                draw_frame.done = True
+            if self.colorbar:
+                if self.cmap is not None:
+                    dots = max(2, int(round(extent['z'] / inch * dpi)))
 
-            draw_frame.done = False
+                    colorbar = colorize([[n / (dots - 1.0)]
+                        for n in reversed(range(dots))], self.cmap)
 
-            def draw_axes():
-                if draw_axes.done:
-                    return
+                    self.colorbar = '%s.bar.png' % stem
 
-                # paint colorbar:
+                    save(self.colorbar, colorbar)
 
-                if self.colorbar:
-                    if self.cmap is not None:
-                        dots = max(2, int(round(extent['z'] / inch * dpi)))
+                if isinstance(self.colorbar, str):
+                    write('\n\\node at (%.3f, 0) '
+                        '[anchor=south west, inner sep=0, outer sep=0] '
+                        '{\\includegraphics[width=%.3fcm, height=%.3fcm]'
+                        '{%s}};' % (extent['x'] + self.gap,
+                            self.bar, extent['y'], self.colorbar))
+                else:
+                    write('\n\\shade [bottom color=%s, top color=%s]'
+                        % (self.lower, self.upper))
 
-                        colorbar = colorize([[n / (dots - 1.0)]
-                            for n in reversed(range(dots))], self.cmap)
+                    write('\n  (%.3f, 0) rectangle (%.3f, %.3f);'
+                        % (extent['x'] + self.gap,
+                           extent['x'] + self.gap + self.bar,
+                           extent['z']))
 
-                        self.colorbar = '%s.bar.png' % stem
+                if self.zmarks:
+                    for z, label in ticks['z']:
+                        if label is None:
+                            continue
 
-                        save(self.colorbar, colorbar)
+                        write('\n\\node '
+                            '[rotate=90, below] at (%.3f, %.3f) {%s};'
+                            % (extent['x'] + self.gap + self.bar, z, label))
 
-                    if isinstance(self.colorbar, str):
-                        file.write('\n\\node at (%.3f, 0) '
-                            '[anchor=south west, inner sep=0, outer sep=0] '
-                            '{\\includegraphics[width=%.3fcm, height=%.3fcm]'
-                            '{%s}};' % (extent['x'] + self.gap,
-                                self.bar, extent['y'], self.colorbar))
-                    else:
-                        file.write('\n\\shade [bottom color=%s, top color=%s]'
-                            % (self.lower, self.upper))
+            if self.grid:
+                draw_grid()
 
-                        file.write('\n  (%.3f, 0) rectangle (%.3f, %.3f);'
-                            % (extent['x'] + self.gap,
-                               extent['x'] + self.gap + self.bar,
-                               extent['z']))
+            if self.frame:
+                draw_frame()
 
-                    if self.zmarks:
-                        for z, label in ticks['z']:
+            if self.xaxis or self.yaxis:
+                # draw tick marks and labels:
+
+                if (self.xaxis and (self.xmarks and ticks['x'] or
+                    self.xminormarks and minorticks['x']) or
+                    self.yaxis and (self.ymarks and ticks['y'] or
+                    self.yminormarks and minorticks['y'])):
+
+                    write('\n\\draw [line cap=butt]')
+
+                    if self.xaxis and self.xmarks:
+                        for x, label in ticks['x']:
                             if label is None:
                                 continue
 
-                            file.write('\n\\node '
-                                '[rotate=90, below] at (%.3f, %.3f) {%s};'
-                                % (extent['x'] + self.gap + self.bar, z, label))
+                            write('\n  (%.3f, %.3f) -- +(0, %.3f)'
+                                % (x, origin['y'], -self.tick))
 
-                if self.grid:
-                    draw_grid()
+                            if label:
+                                write(' node [below] {%s}' % label)
 
-                if self.frame:
-                    draw_frame()
+                    if self.xaxis and self.xminormarks:
+                        for x in minorticks['x']:
+                            write('\n  (%.3f, %.3f) -- +(0, %.3f)'
+                                % (x, origin['y'], -self.minortick))
 
-                if self.xaxis or self.yaxis:
-                    # draw tick marks and labels:
+                    if self.yaxis and self.ymarks:
+                        for y, label in ticks['y']:
+                            if label is None:
+                                continue
 
-                    if (self.xaxis and (self.xmarks and ticks['x'] or
-                        self.xminormarks and minorticks['x']) or
-                        self.yaxis and (self.ymarks and ticks['y'] or
-                        self.yminormarks and minorticks['y'])):
+                            write('\n  (%.3f, %.3f) -- +(%.3f, 0)'
+                                % (origin['x'], y, -self.tick))
 
-                        file.write('\n\\draw [line cap=butt]')
+                            if label:
+                                write(' node [%s] {%s}'
+                                    % ('left' if origin['x'] else
+                                    'rotate=90, above', label))
 
-                        if self.xaxis and self.xmarks:
-                            for x, label in ticks['x']:
-                                if label is None:
-                                    continue
+                    if self.yaxis and self.yminormarks:
+                        for y in minorticks['y']:
+                            write('\n  (%.3f, %.3f) -- +(%.3f, 0)'
+                                % (origin['x'], y, -self.minortick))
 
-                                file.write('\n  (%.3f, %.3f) -- +(0, %.3f)'
-                                    % (x, origin['y'], -self.tick))
+                    write(';')
 
-                                if label:
-                                    file.write(' node [below] {%s}' % label)
+                # draw coordinate axes:
 
-                        if self.xaxis and self.xminormarks:
-                            for x in minorticks['x']:
-                                file.write('\n  (%.3f, %.3f) -- +(0, %.3f)'
-                                    % (x, origin['y'], -self.minortick))
+                if origin['x'] or origin['y']:
+                    write('\n\\draw [->, line cap=rect]\n  '
+                        '(0, %.3f) -- +(%.3f, 0);'
+                        % (origin['y'], extent['x'] + self.tip))
 
-                        if self.yaxis and self.ymarks:
-                            for y, label in ticks['y']:
-                                if label is None:
-                                    continue
+                    write('\n\\draw [->, line cap=rect]\n  '
+                        '(%.3f, 0) -- +(0, %.3f);'
+                        % (origin['x'], extent['y'] + self.tip))
+                else:
+                    write('\n\\draw [%s-%s, line cap=butt]\n  '
+                        % ('<' * self.xaxis, '>' * self.yaxis))
 
-                                file.write('\n  (%.3f, %.3f) -- +(%.3f, 0)'
-                                    % (origin['x'], y, -self.tick))
+                    if self.xaxis:
+                        write('(%.3f, 0) -- '
+                            % (extent['x'] + self.tip))
 
-                                if label:
-                                    file.write(' node [%s] {%s}'
-                                        % ('left' if origin['x'] else
-                                        'rotate=90, above', label))
+                    write('(0, 0)')
 
-                        if self.yaxis and self.yminormarks:
-                            for y in minorticks['y']:
-                                file.write('\n  (%.3f, %.3f) -- +(%.3f, 0)'
-                                    % (origin['x'], y, -self.minortick))
+                    if self.yaxis:
+                        write(' -- (0, %.3f)'
+                            % (extent['y'] + self.tip))
 
-                        file.write(';')
+                    write(';')
 
-                    # draw coordinate axes:
+            # label coordinate axes:
 
-                    if origin['x'] or origin['y']:
-                        file.write('\n\\draw [->, line cap=rect]\n  '
-                            '(0, %.3f) -- +(%.3f, 0);'
-                            % (origin['y'], extent['x'] + self.tip))
+            if self.xaxis and self.xlabel:
+                if origin['y']:
+                    write('\n\\node [right] at (%.3f, %.3f)'
+                        % (extent['x'] + self.tip, origin['y']))
+                else:
+                    write('\n\\node [below')
 
-                        file.write('\n\\draw [->, line cap=rect]\n  '
-                            '(%.3f, 0) -- +(0, %.3f);'
-                            % (origin['x'], extent['y'] + self.tip))
-                    else:
-                        file.write('\n\\draw [%s-%s, line cap=butt]\n  '
-                            % ('<' * self.xaxis, '>' * self.yaxis))
+                    if ticks['x'] and not self.xclose:
+                        write('=\\baselineskip')
 
-                        if self.xaxis:
-                            file.write('(%.3f, 0) -- '
-                                % (extent['x'] + self.tip))
+                    write('] at (%.3f, %.3f)'
+                        % (extent['x'] / 2, -self.tick))
 
-                        file.write('(0, 0)')
+                write('\n  {%s};' % self.xlabel)
 
-                        if self.yaxis:
-                            file.write(' -- (0, %.3f)'
-                                % (extent['y'] + self.tip))
+            if self.yaxis and self.ylabel:
+                if origin['x']:
+                    write('\n\\node [above] at (%.3f, %.3f)'
+                        % (origin['x'], extent['y'] + self.tip))
+                else:
+                    write('\n\\node [rotate=90, above')
 
-                        file.write(';')
+                    if ticks['y'] and not self.yclose:
+                        write('=\\baselineskip')
 
-                # label coordinate axes:
+                    write('] at (%.3f, %.3f)'
+                        % (-self.tick, extent['y'] / 2))
 
-                if self.xaxis and self.xlabel:
-                    if origin['y']:
-                        file.write('\n\\node [right] at (%.3f, %.3f)'
-                            % (extent['x'] + self.tip, origin['y']))
-                    else:
-                        file.write('\n\\node [below')
+                write('\n  {%s};' % self.ylabel)
 
-                        if ticks['x'] and not self.xclose:
-                            file.write('=\\baselineskip')
+            if self.colorbar and self.zlabel:
+                write('\n\\node [rotate=90, below')
 
-                        file.write('] at (%.3f, %.3f)'
-                            % (extent['x'] / 2, -self.tick))
+                if ticks['z'] and not self.zclose:
+                    write('=\\baselineskip')
 
-                    file.write('\n  {%s};' % self.xlabel)
+                write('] at (%.3f, %.3f)'
+                    % (extent['x'] + self.gap + self.bar, extent['y'] / 2))
 
-                if self.yaxis and self.ylabel:
-                    if origin['x']:
-                        file.write('\n\\node [above] at (%.3f, %.3f)'
-                            % (origin['x'], extent['y'] + self.tip))
-                    else:
-                        file.write('\n\\node [rotate=90, above')
+                write('\n  {%s};' % self.zlabel)
 
-                        if ticks['y'] and not self.yclose:
-                            file.write('=\\baselineskip')
+            draw_axes.done = True
 
-                        file.write('] at (%.3f, %.3f)'
-                            % (-self.tick, extent['y'] / 2))
+        draw_axes.done = False
 
-                    file.write('\n  {%s};' % self.ylabel)
+        if not axes:
+            draw_axes()
 
-                if self.colorbar and self.zlabel:
-                    file.write('\n\\node [rotate=90, below')
+        # plot lines:
 
-                    if ticks['z'] and not self.zclose:
-                        file.write('=\\baselineskip')
+        form = '(%%%d.3f, %%%d.3f)' % (
+            5 if extent['x'] < 10 else 6,
+            5 if extent['y'] < 10 else 6)
 
-                    file.write('] at (%.3f, %.3f)'
-                        % (extent['x'] + self.gap + self.bar, extent['y'] / 2))
+        form = form.__mod__
 
-                    file.write('\n  {%s};' % self.zlabel)
+        sx = scale['x']
+        sy = scale['y']
+        lx = lower['x']
+        ly = lower['y']
+        lz = lower['z']
+        ex = extent['x']
+        ey = extent['y']
 
-                draw_axes.done = True
+        zspan = upper['z'] - lz
 
-            draw_axes.done = False
+        zcolors = {} # lines often share z values
 
-            if not any(line['axes'] for line in self.lines):
-                draw_axes()
+        def scale_length(match):
+            return '%.3f' % (float(match.group(1)) * sy)
+
+        def scale_coordinate(match):
+            d, x, value = match.groups()
 
-            # plot lines:
+            if d:
+                return '%.3f' % (scale[x] * float(value))
+            else:
+                return '%.3f' % (scale[x] * (float(value) - lower[x]))
 
-            form = '(%%%d.3f, %%%d.3f)' % (
-                5 if extent['x'] < 10 else 6,
-                5 if extent['y'] < 10 else 6)
+        for line in self.lines:
+            opts = line['options']
 
-            for line in self.lines:
-                if line['z'] is not None:
-                    ratio = (line['z'] - lower['z']) / (upper['z'] - lower['z'])
+            z = line['z']
 
-                    line['options'].setdefault('color',
-                        '%s!%.1f!%s' % (self.upper, 100 * ratio, self.lower)
-                            if self.cmap is None else self.cmap(ratio))
+            if z is not None:
+                color = zcolors.get(z)
 
-                    if line['options'].get('mark') == 'ball':
-                        line['options'].setdefault('ball_color',
-                            line['options']['color'])
+                if color is None:
+                    ratio = (z - lz) / zspan
 
-                for option in 'line_width', 'mark_size':
-                    if isinstance(line['options'].get(option), (float, int)):
-                        line['options'][option] = ('%.3fcm'
-                            % (line['options'][option] * scale['y']))
+                    color = zcolors[z] = ('%s!%.1f!%s'
+                        % (self.upper, 100 * ratio, self.lower)
+                        if self.cmap is None else self.cmap(ratio))
 
-                for option in line['options']:
-                    if isinstance(line['options'][option], str):
-                        line['options'][option] = re.sub('<([\\d.]+)>',
-                            lambda match: '%.3f' % (float(match.group(1))
-                                * scale['y']), line['options'][option])
+                opts.setdefault('color', color)
 
-                if line['label'] is not None:
-                    label = [line['options'], line['label']]
+                if opts.get('mark') == 'ball':
+                    opts.setdefault('ball_color', opts['color'])
 
-                    for previous in labels:
-                        if label[1] and previous == label:
-                            break
-                    else:
-                        labels.append(label)
+            for option in 'line_width', 'mark_size':
+                value = opts.get(option)
+
+                if isinstance(value, (float, int)):
+                    opts[option] = '%.3fcm' % (value * sy)
 
-                if len(line['x']) and len(line['y']):
-                    for x, y in 'xy', 'yx':
-                        xref = line[x + 'ref']
+            for option, value in opts.items():
+                if isinstance(value, str) and '<' in value:
+                    opts[option] = _length.sub(scale_length, value)
 
-                        if xref is not None:
-                            line[x] = list(line[x])
-                            line[y] = list(line[y])
+            if line['label'] is not None:
+                label = [opts, line['label']]
 
-                            line[x] = [xref] + line[x] + [xref]
-                            line[y] = line[y][:1] + line[y] + line[y][-1:]
+                for previous in labels:
+                    if label[1] and previous == label:
+                        break
+                else:
+                    labels.append(label)
 
-                    points = list(zip(*[[scale[x] * (n - lower[x])
-                        for n in line[x]] for x in 'xy']))
+            if len(line['x']) and len(line['y']):
+                points = [(sx * (a - lx), sy * (b - ly))
+                    for a, b in zip(line['x'], line['y'])]
 
-                    if line['protrusion']:
-                        for i, j in (1, 0), (-2, -1):
-                            if line['weights'] is not None:
-                                if not line['weights'][j]:
-                                    continue
+                # connect ends to reference lines without touching the data:
 
-                            dx = points[j][0] - points[i][0]
-                            dy = points[j][1] - points[i][1]
-                            dr = math.sqrt(dx * dx + dy * dy)
-                            rescale = 1 + line['protrusion'] / dr
+                if line['xref'] is not None:
+                    xref = sx * (line['xref'] - lx)
 
-                            points[j] = (
-                                points[i][0] + dx * rescale,
-                                points[i][1] + dy * rescale,
-                                )
+                    points.insert(0, (xref, points[0][1]))
+                    points.append((xref, points[-1][1]))
 
-                    if line['jump']:
-                        segments = jump(points, distance=line['jump'])
-                    else:
-                        segments = [points]
+                if line['yref'] is not None:
+                    yref = sy * (line['yref'] - ly)
 
-                    if line['weights'] is not None:
-                        segments = [(miter_butt if line['miter'] else fatband)(
-                            segment, line['thickness'], line['weights'],
-                            line['shifts'], line['nib'])
-                            for segment in segments]
+                    points.insert(0, (points[0][0], yref))
+                    points.append((points[-1][0], yref))
 
-                    if line['cut']:
-                        try:
-                            xmin, xmax, ymin, ymax = line['cut']
-                        except (TypeError, ValueError):
-                            xmin = xmax = ymin = ymax = None
+                protrusion = line['protrusion']
 
-                        eps = self.eps if line['options'].get('mark') else 0
+                if protrusion:
+                    weights = line['weights']
 
-                        xmin = (scale['x'] * (xmin - lower['x'])
-                            if xmin is not None else 0) - eps
+                    for i, j in (1, 0), (-2, -1):
+                        if weights is not None:
+                            if not weights[j]:
+                                continue
 
-                        xmax = (scale['x'] * (xmax - lower['x'])
-                            if xmax is not None else extent['x']) + eps
+                        xi, yi = points[i]
+                        xj, yj = points[j]
 
-                        ymin = (scale['y'] * (ymin - lower['y'])
-                            if ymin is not None else 0) - eps
+                        dx = xj - xi
+                        dy = yj - yi
+                        rescale = 1 + protrusion / math.hypot(dx, dy)
 
-                        ymax = (scale['y'] * (ymax - lower['y'])
-                            if ymax is not None else extent['y']) + eps
+                        points[j] = (xi + dx * rescale, yi + dy * rescale)
 
-                        if line['join'] is None:
-                            line['join'] = line['options'].get('fill',
-                                'none') != 'none'
+                if line['jump']:
+                    segments = jump(points, distance=line['jump'])
+                else:
+                    segments = [points]
 
-                        if line['options'].get('only_marks'):
-                            segments = [[(x, y)
-                                for segment in segments
-                                for x, y in segment
-                                if xmin <= x <= xmax and ymin <= y <= ymax]]
-                        else:
-                            segments = [segment
-                                for segment in segments
-                                for segment in cut2d(segment,
-                                    xmin, xmax, ymin, ymax, line['join'])]
+                if line['weights'] is not None:
+                    outline = miter_butt if line['miter'] else fatband
 
-                    if line['omit'] is None:
-                        line['omit'] = 'mark' not in line['options']
+                    thickness = line['thickness']
+                    weights = line['weights']
+                    shifts = line['shifts']
+                    nib = line['nib']
 
-                    for segment in segments:
-                        options = line['options'].copy()
+                    segments = [outline(segment, thickness, weights, shifts,
+                        nib) for segment in segments]
 
-                        if line['omit']:
-                            segment = relevant(segment[::line['sgn']],
-                                self.resolution)
+                if line['cut']:
+                    try:
+                        xmin, xmax, ymin, ymax = line['cut']
+                    except (TypeError, ValueError):
+                        xmin = xmax = ymin = ymax = None
 
-                        elif line['cut'] and line['options'].get('mark') \
-                                and not line['options'].get('only_marks'):
+                    eps = self.eps if opts.get('mark') else 0
 
-                            options['mark_indices'] = '{%s}' % ','.join(str(n)
-                                for n, point in enumerate(segment, 1)
-                                if point in points)
+                    xmin = (sx * (xmin - lx)
+                        if xmin is not None else 0) - eps
 
-                        if line['shortcut']:
-                            segment = shortcut(segment, line['shortcut'],
-                                line['shortcut_rel'])
+                    xmax = (sx * (xmax - lx)
+                        if xmax is not None else ex) + eps
 
-                        file.write('\n\\draw%s plot coordinates {'
-                            % csv(options))
+                    ymin = (sy * (ymin - ly)
+                        if ymin is not None else 0) - eps
 
-                        for group in groups(segment):
-                            file.write('\n  ')
-                            file.write(' '.join(form % point
-                                for point in group))
+                    ymax = (sy * (ymax - ly)
+                        if ymax is not None else ey) + eps
 
-                        file.write(' };')
+                    if line['join'] is None:
+                        line['join'] = opts.get('fill', 'none') != 'none'
 
-                # insert TikZ code with special coordinates:
+                    if opts.get('only_marks'):
+                        segments = [[(x, y)
+                            for segment in segments
+                            for x, y in segment
+                            if xmin <= x <= xmax and ymin <= y <= ymax]]
+                    else:
+                        segments = [segment
+                            for segment in segments
+                            for segment in cut2d(segment,
+                                xmin, xmax, ymin, ymax, line['join'])]
 
-                if line['code']:
-                    code = line['code'].strip()
+                if line['omit'] is None:
+                    line['omit'] = 'mark' not in opts
 
-                    for x in 'xy':
-                        code = re.sub('<%s=(.*?)>' % x, lambda match: '%.3f'
-                            % (scale[x] * (float(match.group(1)) - lower[x])),
-                            code)
+                # look up line properties once for all segments:
 
-                        code = re.sub('<d%s=(.*?)>' % x, lambda match: '%.3f'
-                            % (scale[x] * float(match.group(1))),
-                            code)
+                omit = line['omit']
+                sgn = line['sgn']
 
-                    file.write('\n%s' % code)
+                indices = (line['cut'] and opts.get('mark')
+                    and not opts.get('only_marks'))
 
-                if line['grid']:
-                    draw_grid()
+                if indices:
+                    original = set(points)
 
-                if line['frame']:
-                    draw_frame()
+                cutoff = line['shortcut']
+                cutoff_rel = line['shortcut_rel']
 
-                if line['axes']:
-                    draw_axes()
+                for segment in segments:
+                    options = opts.copy()
 
-            draw_axes()
+                    if omit:
+                        segment = relevant(segment[::sgn], self.resolution)
 
-            def position(pos):
-                if isinstance(pos, str):
-                    x = []
-                    y = []
+                    elif indices:
+                        options['mark_indices'] = '{%s}' % ','.join(str(n)
+                            for n, point in enumerate(segment, 1)
+                            if point in original)
 
-                    positions = dict(
-                        L=(x, -self.left),
-                        B=(y, -self.bottom),
-                        l=(x, 0.0),
-                        b=(y, 0.0),
-                        r=(x, extent['x']),
-                        t=(y, extent['y']),
-                        R=(x, extent['x'] + self.right),
-                        T=(y, extent['y'] + self.top),
-                        )
+                    if cutoff:
+                        segment = shortcut(segment, cutoff, cutoff_rel)
 
-                    abbreviations = dict(c='lr', C='LR', m='bt', M='BT')
+                    write('\n\\draw%s plot coordinates {'
+                        % csv(options))
 
-                    for abbreviation in abbreviations.items():
-                        pos = pos.replace(*abbreviation)
+                    for group in groups(segment):
+                        write('\n  ')
+                        write(' '.join(map(form, group)))
 
-                    for char in pos:
-                        positions[char][0].append(positions[char][1])
+                    write(' };')
 
-                    x = sum(x) / len(x)
-                    y = sum(y) / len(y)
-                else:
-                    x, y = pos
-                    x = scale['x'] * (x - lower['x'])
-                    y = scale['y'] * (y - lower['y'])
+            # insert TikZ code with special coordinates:
+
+            if line['code']:
+                code = _coordinate.sub(scale_coordinate, line['code'].strip())
+
+                write('\n%s' % code)
 
-                return x, y
+            if line['grid']:
+                draw_grid()
 
-            # add label:
+            if line['frame']:
+                draw_frame()
 
-            if self.label is not None:
-                if self.labelformat is not None:
-                    self.label = self.labelformat(self.label)
+            if line['axes']:
+                draw_axes()
 
-                if self.labelsize is not None:
-                    self.label = ('\\fontsize{%d}{%d}\\selectfont %s'
-                        % (self.labelsize, self.labelsize, self.label))
+        draw_axes()
+
+        anchors = dict(
+            L=(0, -self.left),
+            B=(1, -self.bottom),
+            l=(0, 0.0),
+            b=(1, 0.0),
+            r=(0, extent['x']),
+            t=(1, extent['y']),
+            R=(0, extent['x'] + self.right),
+            T=(1, extent['y'] + self.top),
+            )
 
-                file.write('\n\\node at (%.3f, %.3f)' % position(self.labelpos))
-                file.write(' [%s] {%s};' % (self.labelopt, self.label))
+        def position(pos):
+            if isinstance(pos, str):
+                for abbreviation in _abbreviations:
+                    pos = pos.replace(*abbreviation)
 
-            # add legend:
+                total = [0.0, 0.0]
+                count = [0, 0]
 
-            if self.lput and (self.ltop is not None or labels):
-                file.write('\n\\node [align=%s' % self.lali)
+                for char in pos:
+                    axis, value = anchors[char]
+                    total[axis] += value
+                    count[axis] += 1
 
-                if self.lopt is not None:
-                    file.write(', %s' % self.lopt)
+                x = total[0] / count[0]
+                y = total[1] / count[1]
+            else:
+                x, y = pos
+                x = scale['x'] * (x - lower['x'])
+                y = scale['y'] * (y - lower['y'])
 
-                if self.lbox:
-                    file.write(', draw=gray, fill=white, rounded corners=1pt')
+            return x, y
 
-                file.write('] at (%.3f, %.3f) {' % position(self.lpos))
+        # add label:
 
-                if self.ltop:
-                    file.write('\n  %s' % self.ltop)
+        if self.label is not None:
+            if self.labelformat is not None:
+                self.label = self.labelformat(self.label)
 
-                    if labels:
-                        file.write(' \\\\')
+            if self.labelsize is not None:
+                self.label = ('\\fontsize{%d}{%d}\\selectfont %s'
+                    % (self.labelsize, self.labelsize, self.label))
 
-                        if self.lsep is not None:
-                            file.write('[%s]' % self.lsep)
+            write('\n\\node at (%.3f, %.3f)' % position(self.labelpos))
+            write(' [%s] {%s};' % (self.labelopt, self.label))
+
+        # add legend:
+
+        if self.lput and (self.ltop is not None or labels):
+            write('\n\\node [align=%s' % self.lali)
+
+            if self.lopt is not None:
+                write(', %s' % self.lopt)
+
+            if self.lbox:
+                write(', draw=gray, fill=white, rounded corners=1pt')
+
+            write('] at (%.3f, %.3f) {' % position(self.lpos))
+
+            if self.ltop:
+                write('\n  %s' % self.ltop)
 
                 if labels:
-                    file.write('\n  \\begin{tikzpicture}[x=%s, y=-%s]'
-                        % (self.llen, self.lbls))
+                    write(' \\\\')
 
-                    lrow = self.lrow or 1 + (len(labels) - 1) // self.lcol
+                    if self.lsep is not None:
+                        write('[%s]' % self.lsep)
 
-                    spacer = True
+            if labels:
+                write('\n  \\begin{tikzpicture}[x=%s, y=-%s]'
+                    % (self.llen, self.lbls))
 
-                    n = 0
+                lrow = self.lrow or 1 + (len(labels) - 1) // self.lcol
 
-                    for options, label in labels:
-                        col = n // lrow
-                        row = n % lrow
+                spacer = True
 
-                        if label == '*next*':
-                            label = None
-                            row -= 0.2
-                        else:
-                            n += 1
+                n = 0
 
-                        if label:
-                            file.write('\n    \\node '
-                                '[right] at (%.3f, %d) {%s};'
-                                % (col * self.lwid + 1, row, label))
+                for options, label in labels:
+                    col = n // lrow
+                    row = n % lrow
 
-                        fill = options.get('fill', 'none') != 'none'
-                        draw = not options.get('only_marks')
-                        draw &= not options.get('draw') == 'none'
-                        mark = 'mark' in options
+                    if label == '*next*':
+                        label = None
+                        row -= 0.2
+                    else:
+                        n += 1
+
+                    if label:
+                        write('\n    \\node '
+                            '[right] at (%.3f, %d) {%s};'
+                            % (col * self.lwid + 1, row, label))
+
+                    fill = options.get('fill', 'none') != 'none'
+                    draw = not options.get('only_marks')
+                    draw &= not options.get('draw') == 'none'
+                    mark = 'mark' in options
 
-                        if fill or draw or mark:
-                            if (fill or draw) and mark:
-                                options['mark_indices'] = '{2}'
+                    if fill or draw or mark:
+                        if (fill or draw) and mark:
+                            options['mark_indices'] = '{2}'
 
-                            file.write('\n    \\draw%s' % csv(options))
-                            file.write('\n      plot coordinates ')
+                        write('\n    \\draw%s' % csv(options))
+                        write('\n      plot coordinates ')
 
-                            if fill:
-                                top = row - 0.1
-                                bot = row + 0.1
-                                x = [0.0] + [0.5] * mark + [1.0, 1.0, 0.0, 0.0]
-                                y = [bot] + [bot] * mark + [bot, top, top, bot]
-                            elif draw:
-                                x = [0.0] + [0.5] * mark + [1.0]
-                                y = [row] + [row] * mark + [row]
-                            elif mark:
-                                x = [0.5]
-                                y = [row]
+                        if fill:
+                            top = row - 0.1
+                            bot = row + 0.1
+                            x = [0.0] + [0.5] * mark + [1.0, 1.0, 0.0, 0.0]
+                            y = [bot] + [bot] * mark + [bot, top, top, bot]
+                        elif draw:
+                            x = [0.0] + [0.5] * mark + [1.0]
+                            y = [row] + [row] * mark + [row]
+                        elif mark:
+                            x = [0.5]
+                            y = [row]
 
-                            file.write('{')
+                        write('{')
 
-                            for m in range(len(x)):
-                                file.write(' (%.3f, %g)'
-                                    % (col * self.lwid + x[m], y[m]))
+                        for m in range(len(x)):
+                            write(' (%.3f, %g)'
+                                % (col * self.lwid + x[m], y[m]))
 
-                            file.write(' };')
+                        write(' };')
 
-                        if draw or fill and not col:
-                            spacer = False
+                    if draw or fill and not col:
+                        spacer = False
 
-                    if spacer:
-                        file.write('\n    \\useasboundingbox (0, 0);')
+                if spacer:
+                    write('\n    \\useasboundingbox (0, 0);')
 
-                    file.write('\n  \\end{tikzpicture}%')
+                write('\n  \\end{tikzpicture}%')
 
-                file.write('\n  };')
+            write('\n  };')
 
-            # add title:
+        # add title:
 
-            if self.title is not None:
-                options = dict(above=True)
+        if self.title is not None:
+            options = dict(above=True)
 
-                if '\\\\' in self.title:
-                    options['align'] = 'center'
+            if '\\\\' in self.title:
+                options['align'] = 'center'
 
-                file.write('\n\\node%s at (%.3f, %.3f) {%s};'
-                    % (csv(options), extent['x'] / 2, extent['y'], self.title))
+            write('\n\\node%s at (%.3f, %.3f) {%s};'
+                % (csv(options), extent['x'] / 2, extent['y'], self.title))
 
-            # close TikZ environment:
+        # close TikZ environment:
 
-            file.write('\n\\end{tikzpicture}%')
+        write('\n\\end{tikzpicture}%')
 
-            # close document:
+        # close document:
 
-            if standalone:
-                file.write('\n\\end{document}')
+        if standalone:
+            write('\n\\end{document}')
 
-            file.write('\n')
+        write('\n')
+
+        # write LaTeX file at once:
+
+        with open('%s.tex' % stem, 'w') as file:
+            file.write(''.join(tex))
 
         # typeset document and clean up:
 
@@ -59,24 +59,27 @@ def save(filename, image):
 
     # 0 before each row: https://www.w3.org/TR/PNG/#4Concepts.EncodingFiltering
 
-    with open(filename, 'wb') as png:
-        png.write(b'\x89PNG\r\n\x1a\n')
+    data = [b'\x89PNG\r\n\x1a\n']
 
-        def chunk(name, data):
-            png.write(struct.pack('!I', len(data)))
-            png.write(name)
-            png.write(data)
-            png.write(struct.pack('!I', zlib.crc32(name + data) & 0xffffffff))
+    def chunk(name, content):
+        data.append(struct.pack('!I', len(content)))
+        data.append(name)
+        data.append(content)
+        data.append(struct.pack('!I', zlib.crc32(name + content) & 0xffffffff))
 
-        chunk(b'IHDR', struct.pack('!2I5B', width, height, 8, color, 0, 0, 0))
+    chunk(b'IHDR', struct.pack('!2I5B', width, height, 8, color, 0, 0, 0))
 
-        if color == 3:
-            chunk(b'PLTE', struct.pack('%dB' % len(plte), *plte))
+    if color == 3:
+        chunk(b'PLTE', struct.pack('%dB' % len(plte), *plte))
+
+    chunk(b'IDAT', zlib.compress(struct.pack('%dB' % len(byte), *byte), 9))
 
-        chunk(b'IDAT',
-            zlib.compress(struct.pack('%dB' % len(byte), *byte), 9))
+    chunk(b'IEND', b'')
 
-        chunk(b'IEND', b'')
+    # write PNG file at once:
+
+    with open(filename, 'wb') as png:
+        png.write(b''.join(data))
 
 def load(filename):
     """Load 8-bit PNG image.
@@ -7,7 +7,9 @@ from __future__ import division
 
 import re
 
-from .calc import divide, subtract, cross, dot, length, distance
+from .calc import divide, subtract, cross, _dot3, _length3
+
+_length = re.compile('(?<=<)([\\d.]+)(?=>)')
 
 def projection(
         r=[0.0, 0.0, 0.0], # object
@@ -35,11 +37,11 @@ def projection(
     """
     # viewing direction:
     Z = subtract(T, R)
-    Z = divide(Z, length(Z))
+    Z = divide(Z, _length3(Z))
 
     # horizontal screen direction:
     X = cross(Z, U)
-    X = divide(X, length(X))
+    X = divide(X, _length3(X))
 
     # vertical screen direction:
     Y = cross(X, Z)
@@ -48,19 +50,19 @@ def projection(
     D = subtract(r, R)
 
     # observer-object distance (hypotenuse):
-    hyp = length(D)
+    hyp = _length3(D)
 
     # projection onto viewing direction (adjacent leg):
-    adj = dot(D, Z)
+    adj = _dot3(D, Z)
 
     # secant of angle of object w.r.t. viewing direction:
     sec = hyp / adj
 
     # horizontal screen coordinate:
-    x = dot(X, D) / adj
+    x = _dot3(X, D) / adj
 
     # vertical screen coordinate:
-    y = dot(Y, D) / adj
+    y = _dot3(Y, D) / adj
 
     # magnification factor ("zoom", "z-index"):
     z = sec / adj
@@ -96,21 +98,25 @@ def project(objects, by_distance=True, return_cosines=False, return_order=False,
     -------
     list of tuple
         Objects in same format, but sorted with transformed coordinates and
-        adjusted styles.
+        adjusted styles. Styles without anything to adjust are not copied.
     list of float, optional
         Cosines of angles between objects and viewing direction.
     list of int, optional
         Sorting order.
     """
-    if by_distance:
-        distances = [distance(R, [sum(x) / len(x) for x in zip(*coordinates)])
-            for coordinates, style in objects]
+    distances = []
+    cosines = []
+    projected = []
 
-    if return_cosines:
-        cosines = []
+    for coordinates, style in objects:
+        if by_distance or return_cosines:
+            center = [sum(x) / len(x) for x in zip(*coordinates)]
 
-        for coordinates, style in objects:
-            view = subtract(R, [sum(x) / len(x) for x in zip(*coordinates)])
+        if by_distance:
+            distances.append(_length3(subtract(R, center)))
+
+        if return_cosines:
+            view = subtract(R, center)
 
             if len(coordinates) < 2:
                 normal = view
@@ -121,29 +127,43 @@ def project(objects, by_distance=True, return_cosines=False, return_order=False,
                 normal = cross(subtract(coordinates[1], coordinates[0]),
                     subtract(coordinates[2], coordinates[0]))
 
-            cosines.append(abs(dot(normal, view))
-                / (length(normal) * length(view)))
+            cosines.append(abs(_dot3(normal, view))
+                / (_length3(normal) * _length3(view)))
+
+        # project object and scale style by average zoom factor:
+
+        coordinates = [projection(coordinate, R=R, *args, **kwargs)
+            for coordinate in coordinates]
 
-    objects = [([projection(coordinate, R=R, *args, **kwargs)
-        for coordinate in coordinates], style.copy())
-        for coordinates, style in objects]
+        z = sum(coordinate[2] for coordinate in coordinates) / len(coordinates)
 
-    zoom = [sum(coordinate[2]
-        for coordinate in coordinates) / len(coordinates)
-        for coordinates, style in objects]
+        def scale_length(match):
+            return '%.3f' % (float(match.group(1)) * z)
+
+        scaled = {}
 
-    for n, (coordinates, style) in enumerate(objects):
         for option in 'line_width', 'mark_size':
             if isinstance(style.get(option), (float, int)):
-                style[option] *= zoom[n]
+                scaled[option] = style[option] * z
+
+        for option, value in style.items():
+            if isinstance(value, str) and '<' in value:
+                scaled[option] = _length.sub(scale_length, value)
+
+        # copy style only if there is something to scale:
 
-        for option in style:
-            if isinstance(style[option], str):
-                style[option] = re.sub('(?<=<)([\\d.]+)(?=>)', lambda match:
-                    '%.3f' % (float(match.group(1)) * zoom[n]), style[option])
+        if scaled:
+            style = style.copy()
+            style.update(scaled)
+
+        projected.append((coordinates, style))
+
+    objects = projected
 
     if by_distance:
-        order = sorted(range(len(distances)), key=lambda n: -distances[n])
+        order = sorted(range(len(distances)), key=distances.__getitem__,
+            reverse=True)
+
         objects = [objects[n] for n in order]
 
         if return_order:
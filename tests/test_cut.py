@@ -0,0 +1,16 @@
+import math
+import unittest
+
+import storylines
+
+class TestRelevant(unittest.TestCase):
+    def test_nan(self):
+        nan = float('nan')
+
+        points = [(0, 0), (1, 0), (2, 0), (nan, nan), (2, 5), (2, 10)]
+
+        for x, y in storylines.relevant(points):
+            self.assertFalse(math.isnan(x) or math.isnan(y), 'NaN vertex kept')
+
+if __name__ == '__main__':
+    unittest.main()
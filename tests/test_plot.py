@@ -0,0 +1,37 @@
+import fractions
+import os
+import shutil
+import tempfile
+import unittest
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import storylines
+
+class TestFormat(unittest.TestCase):
+    def test_fraction(self):
+        self.assertEqual(storylines.plot._default_format(
+            fractions.Fraction(1, 2)), '0.5')
+
+class TestSave(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @unittest.skipIf(np is None, 'NumPy not available')
+    def test_numpy_nan(self):
+        plot = storylines.Plot()
+        plot.line(np.array([0.0, 1.0, np.nan, 2.0, 3.0]), [0, 1, 2, 3, 4])
+
+        filename = os.path.join(self.directory, 'nan.tex')
+        plot.save(filename)
+
+        self.assertTrue(os.path.exists(filename))
+
+if __name__ == '__main__':
+    unittest.main()